@@ -1,15 +1,18 @@
 import os
+import re
 
-def try_parse(type_, value: str):
-    try:
-        return type_(value)
-    except Exception:
-        return None
+__all__ = ["MQTT_BROKER_HOST", "MQTT_BROKER_PORT", "MQTT_TOPIC", "DELAY"]
 
 # MQTT config
 MQTT_BROKER_HOST = os.environ.get("MQTT_BROKER_HOST") or "mqtt"
-MQTT_BROKER_PORT = try_parse(int, os.environ.get("MQTT_BROKER_PORT") or "") or 1883
+_mqtt_broker_port = os.environ.get("MQTT_BROKER_PORT", "").strip()
+# non-numeric or 0 falls back to the default port
+MQTT_BROKER_PORT = (int(_mqtt_broker_port) if _mqtt_broker_port.isdecimal() else 0) or 1883
 MQTT_TOPIC = os.environ.get("MQTT_TOPIC") or "agent_data_topic"
 
 # Delay for sending data to mqtt in seconds
-DELAY = try_parse(float, os.environ.get("DELAY") or "") or 0.1
\ No newline at end of file
+# unsigned decimal or exponent form: 0.5, .5, 5., 1e-3
+_FLOAT_RE = re.compile(r"(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?", re.ASCII)
+_delay = os.environ.get("DELAY", "").strip()
+# non-numeric or 0 falls back to the default delay
+DELAY = (float(_delay) if _FLOAT_RE.fullmatch(_delay) else 0.0) or 0.1
@@ -1,5 +1,4 @@
 from dataclasses import dataclass
-from datetime import datetime
 
 from domain.accelerometer import Accelerometer
 from domain.gps import Gps
@@ -8,4 +7,5 @@ from domain.gps import Gps
 class AggregatedData:
     accelerometer: Accelerometer
     gps: Gps
-    time: datetime
\ No newline at end of file
+    # час отримання даних, наносекунди від epoch (UTC), див. time.time_ns()
+    time: int
@@ -1,20 +1,42 @@
-from csv import reader
-from datetime import datetime
+import time
+
+import numpy as np
 
 from domain.aggregated_data import AggregatedData
 from domain.accelerometer import Accelerometer
 from domain.gps import Gps
 
-class FileDatasource:
-    def __init__(self, accelerometer_filename: str, gps_filename: str) -> None:
-        self._acc_filename = accelerometer_filename
-        self._gps_filename = gps_filename
 
-        self._acc_file = None
-        self._gps_file = None
+# Один запис підготовленого файлу: акселерометр + GPS поруч (див. prepare_data.py).
+# Сирі значення MEMS акселерометра вміщаються в int16.
+RECORD_DTYPE = np.dtype(
+    [("x", "<i2"), ("y", "<i2"), ("z", "<i2"), ("lon", "<f8"), ("lat", "<f8")]
+)
+
+
+class FileDatasource:
+    def __init__(self, data_filename: str) -> None:
+        # .npy з записами RECORD_DTYPE, створений prepare_data.prepare()
+        self._data_filename = data_filename
+        self._data = None
+
+        # окремий (strided) вигляд на кожне поле записів, без копіювання
+        self._x = self._y = self._z = None
+        self._lon = self._lat = None
+
+        self._i = 0
+
+        # один екземпляр на весь час роботи, read() лише оновлює його поля
+        self._accelerometer = Accelerometer(x=0, y=0, z=0)
+        self._gps = Gps(longitude=0.0, latitude=0.0)
+        self._aggregated = AggregatedData(
+            accelerometer=self._accelerometer, gps=self._gps, time=0
+        )
 
-        self._acc_reader = None
-        self._gps_reader = None
+        # буфери для read_batch(), виділяються під розмір пакета один раз
+        self._batch_offsets = None
+        self._batch_index = None
+        self._batch = None
 
     def startReading(self, *args, **kwargs):
         """Метод повинен викликатись перед початком читання даних"""
@@ -25,82 +47,79 @@ class FileDatasource:
         self._close_files()
 
     def read(self) -> AggregatedData:
-        """Метод повертає дані отримані з датчиків"""
-        if self._acc_reader is None or self._gps_reader is None:
+        """
+        Метод повертає дані отримані з датчиків.
+
+        Повертається один і той самий об'єкт AggregatedData з оновленими
+        полями, тому його треба серіалізувати до наступного виклику read().
+        """
+        if self._data is None:
             # якщо забули startReading()
             self._open_files()
 
-        acc_row = self._next_row(self._acc_reader, source="acc")
-        gps_row = self._next_row(self._gps_reader, source="gps")
+        # кінець файлу → почати з початку; курсор завжди в межах [0, len)
+        i = self._i
+        self._i = (i + 1) % len(self._data)
 
-        # Очікуємо формати:
-        # accelerometer.csv: x,y,z
-        # gps.csv: longitude,latitude
-        x, y, z = int(acc_row[0]), int(acc_row[1]), int(acc_row[2])
-        longitude, latitude = float(gps_row[0]), float(gps_row[1])
+        acc = self._accelerometer
+        acc.x = int(self._x[i])
+        acc.y = int(self._y[i])
+        acc.z = int(self._z[i])
 
-        return AggregatedData(
-            accelerometer=Accelerometer(x=x, y=y, z=z),
-            gps=Gps(longitude=longitude, latitude=latitude),
-            time=datetime.utcnow(),
-        )
+        gps = self._gps
+        gps.longitude = float(self._lon[i])
+        gps.latitude = float(self._lat[i])
 
-    def _open_files(self):
-        self._close_files()
+        self._aggregated.time = time.time_ns()
+        return self._aggregated
 
-        self._acc_file = open(self._acc_filename, "r", newline="", encoding="utf-8")
-        self._gps_file = open(self._gps_filename, "r", newline="", encoding="utf-8")
+    def read_batch(self, n: int):
+        """
+        Метод повертає n наступних показів датчиків як масиви
+        (x, y, z, longitude, latitude).
 
-        self._acc_reader = reader(self._acc_file)
-        self._gps_reader = reader(self._gps_file)
+        Масиви — це внутрішні буфери, які перезаписуються наступним викликом.
+        """
+        if self._data is None:
+            # якщо забули startReading()
+            self._open_files()
 
-        # якщо у файлах є хедери — можна пропустити автоматично (опційно)
-        self._skip_header_if_present(self._acc_reader, expected_cols=3)
-        self._skip_header_if_present(self._gps_reader, expected_cols=2)
+        if self._batch is None or len(self._batch_index) != n:
+            self._batch_offsets = np.arange(n, dtype=np.intp)
+            self._batch_index = np.empty(n, dtype=np.intp)
+            self._batch = (
+                np.empty(n, dtype=np.int16),
+                np.empty(n, dtype=np.int16),
+                np.empty(n, dtype=np.int16),
+                np.empty(n, dtype=np.float64),
+                np.empty(n, dtype=np.float64),
+            )
+
+        index = self._batch_index
+        np.add(self._batch_offsets, self._i, out=index)
+        self._i = (self._i + n) % len(self._data)
+
+        # mode="wrap" бере індекс по модулю довжини кожного масиву окремо
+        out_x, out_y, out_z, out_lon, out_lat = self._batch
+        np.take(self._x, index, out=out_x, mode="wrap")
+        np.take(self._y, index, out=out_y, mode="wrap")
+        np.take(self._z, index, out=out_z, mode="wrap")
+        np.take(self._lon, index, out=out_lon, mode="wrap")
+        np.take(self._lat, index, out=out_lat, mode="wrap")
+        return self._batch
 
-    def _close_files(self):
-        if self._acc_file:
-            self._acc_file.close()
-        if self._gps_file:
-            self._gps_file.close()
-
-        self._acc_file = None
-        self._gps_file = None
-        self._acc_reader = None
-        self._gps_reader = None
-
-    def _next_row(self, csv_reader, source: str):
-        try:
-            row = next(csv_reader)
-            # пропускаємо пусті рядки
-            while row is not None and (len(row) == 0 or all(not c.strip() for c in row)):
-                row = next(csv_reader)
-            return row
-        except StopIteration:
-            # кінець файлу → почати з початку (ідея для підвищення оцінки)
-            self._open_files()
-            return self._next_row(self._acc_reader if source == "acc" else self._gps_reader, source)
+    def _open_files(self):
+        # файл відображається в пам'ять, дані підтягуються ОС за потреби
+        self._data = np.load(self._data_filename, mmap_mode="r")
+        if self._data.dtype != RECORD_DTYPE:
+            raise ValueError(f"{self._data_filename}: неочікуваний формат записів")
 
-    def _skip_header_if_present(self, csv_reader, expected_cols: int):
-        """
-        Якщо перший рядок не числовий (типу 'x,y,z'), пропускаємо його.
-        """
-        try:
-            peek = next(csv_reader)
-        except StopIteration:
-            return
-
-        # якщо неправильна кількість колонок — просто повертаємо назад не можемо, тому залишимо як є
-        if len(peek) != expected_cols:
-            return
-
-        # якщо перша колонка не число — це хедер
-        try:
-            float(peek[0])
-            # це НЕ хедер → нічого не робимо, але ми вже "з’їли" рядок 😄
-            # тому робимо простий хак: відкриємо файли заново і без пропуску
-            # (але тільки якщо це не хедер)
-            raise ValueError
-        except Exception:
-            # це хедер → ок, просто пропущено
-            return
\ No newline at end of file
+        self._x, self._y, self._z = self._data["x"], self._data["y"], self._data["z"]
+        self._lon, self._lat = self._data["lon"], self._data["lat"]
+        self._i = 0
+
+    def _close_files(self):
+        self._data = None
+        self._x = self._y = self._z = None
+        self._lon = self._lat = None
+        self._i = 0
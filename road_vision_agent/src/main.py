@@ -1,10 +1,16 @@
 from paho.mqtt import client as mqtt_client
 import time
 
-from schema.aggregated_data_schema import AggregatedDataSchema
+from schema.aggregated_data_schema import encode
 from file_datasource import FileDatasource
+from prepare_data import is_prepared, prepare
 import config
 
+ACCELEROMETER_CSV = "data/accelerometer.csv"
+GPS_CSV = "data/gps.csv"
+# обидва CSV, зведені в один файл записів (див. prepare_data.py)
+DATA_FILE = "data/agent_data.npy"
+
 def connect_mqtt(broker, port):
     print(f"CONNECT TO {broker}:{port}")
 
@@ -26,7 +32,8 @@ def publish(client, topic, datasource, delay):
     while True:
         time.sleep(delay)
         data = datasource.read()
-        msg = AggregatedDataSchema().dumps(data)
+        acc, gps = data.accelerometer, data.gps
+        msg = encode(acc.x, acc.y, acc.z, gps.longitude, gps.latitude, data.time)
 
         result = client.publish(topic, msg)
         status = result[0]
@@ -35,7 +42,9 @@ def publish(client, topic, datasource, delay):
 
 def run():
     client = connect_mqtt(config.MQTT_BROKER_HOST, config.MQTT_BROKER_PORT)
-    datasource = FileDatasource("data/accelerometer.csv", "data/gps.csv")
+    if not is_prepared(ACCELEROMETER_CSV, GPS_CSV, DATA_FILE):
+        prepare(ACCELEROMETER_CSV, GPS_CSV, DATA_FILE)
+    datasource = FileDatasource(DATA_FILE)
     publish(client, config.MQTT_TOPIC, datasource, config.DELAY)
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+import argparse
+import os
+
+import numpy as np
+
+from file_datasource import RECORD_DTYPE
+
+
+def _load_csv(filename: str, dtype, columns: int) -> np.ndarray:
+    """
+    Зчитує числовий CSV з columns колонками у двовимірний масив.
+    Якщо перший непорожній рядок не числовий (типу 'x,y,z'), пропускаємо його.
+    Рядок з іншою кількістю колонок — помилка, а не зсув решти даних.
+    """
+    with open(filename, "r", newline="", encoding="utf-8") as file:
+        position = file.tell()
+        first = file.readline()
+        while first and not first.strip():
+            position = file.tell()
+            first = file.readline()
+
+        # дивимось на першу колонку без float() і без винятків
+        value = first.split(",")[0].strip().lstrip("+-").replace(".", "", 1)
+        if value.isdigit():
+            # це дані, а не хедер → повертаємось на початок рядка
+            file.seek(position)
+
+        # loadtxt розбирає в C, пропускає порожні рядки і падає на рваних
+        try:
+            values = np.loadtxt(file, delimiter=",", dtype=dtype, ndmin=2)
+        except ValueError as exc:
+            raise ValueError(f"{filename}: {exc}") from exc
+
+    if values.size == 0:
+        raise ValueError(f"{filename}: немає даних")
+    if values.shape[1] != columns:
+        raise ValueError(
+            f"{filename}: очікується {columns} колонок, знайдено {values.shape[1]}"
+        )
+    return values
+
+
+def prepare(accelerometer_filename: str, gps_filename: str, data_filename: str) -> None:
+    """
+    Об'єднує accelerometer.csv і gps.csv в один .npy файл із записами
+    RECORD_DTYPE, який FileDatasource відображає в пам'ять.
+    Коротший з файлів повторюється по колу до довжини довшого.
+    """
+    acc = _load_csv(accelerometer_filename, np.int32, columns=3)
+    gps = _load_csv(gps_filename, np.float64, columns=2)
+
+    # x, y, z зберігаються як int16 — значення поза діапазоном не обрізаємо мовчки
+    limits = np.iinfo(RECORD_DTYPE["x"])
+    if acc.size and (acc.min() < limits.min or acc.max() > limits.max):
+        raise ValueError(
+            f"{accelerometer_filename}: значення поза діапазоном int16 "
+            f"({limits.min}..{limits.max})"
+        )
+
+    records = np.empty(max(len(acc), len(gps)), dtype=RECORD_DTYPE)
+    index = np.arange(len(records))
+    records["x"], records["y"], records["z"] = acc.take(index, axis=0, mode="wrap").T
+    records["lon"], records["lat"] = gps.take(index, axis=0, mode="wrap").T
+
+    np.save(data_filename, records)
+
+
+def is_prepared(accelerometer_filename: str, gps_filename: str, data_filename: str) -> bool:
+    """
+    Чи існує підготовлений файл, чи він новіший за обидва CSV,
+    чи він читається і чи записи в ньому мають поточний RECORD_DTYPE.
+    """
+    if not os.path.exists(data_filename):
+        return False
+    prepared_at = os.path.getmtime(data_filename)
+    if any(
+        os.path.getmtime(filename) > prepared_at
+        for filename in (accelerometer_filename, gps_filename)
+    ):
+        return False
+    try:
+        data = np.load(data_filename, mmap_mode="r")
+    except (OSError, EOFError, ValueError):
+        # обрізаний або пошкоджений файл просто готується заново
+        return False
+    return data.dtype == RECORD_DTYPE and len(data) > 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Підготовка даних агента: два CSV → один .npy файл"
+    )
+    parser.add_argument("accelerometer_csv")
+    parser.add_argument("gps_csv")
+    parser.add_argument("output_npy")
+    args = parser.parse_args()
+
+    prepare(args.accelerometer_csv, args.gps_csv, args.output_npy)
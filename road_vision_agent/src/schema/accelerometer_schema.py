@@ -1,6 +0,0 @@
-from marshmallow import Schema, fields
-
-class AccelerometerSchema(Schema):
-    x = fields.Int(required=True)
-    y = fields.Int(required=True)
-    z = fields.Int(required=True)
\ No newline at end of file
@@ -1,9 +1,20 @@
-from marshmallow import Schema, fields
-from schema.accelerometer_schema import AccelerometerSchema
-from schema.gps_schema import GpsSchema
+from datetime import datetime, timezone
 
+import orjson
 
-class AggregatedDataSchema(Schema):
-    accelerometer = fields.Nested(AccelerometerSchema, required=True)
-    gps = fields.Nested(GpsSchema, required=True)
-    timestamp = fields.DateTime("iso", attribute="time")
+
+def encode(x: int, y: int, z: int, longitude: float, latitude: float, time: int) -> bytes:
+    """
+    Серіалізує один показ датчиків у JSON для MQTT.
+
+    time — наносекунди від epoch (UTC), у datetime переводимо лише тут;
+    формат як у datetime.utcnow().isoformat() — UTC без зсуву.
+    """
+    moment = datetime.fromtimestamp(time / 1e9, timezone.utc).replace(tzinfo=None)
+    return orjson.dumps(
+        {
+            "accelerometer": {"x": x, "y": y, "z": z},
+            "gps": {"longitude": longitude, "latitude": latitude},
+            "timestamp": moment,
+        }
+    )
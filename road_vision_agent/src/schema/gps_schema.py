@@ -1,5 +0,0 @@
-from marshmallow import Schema, fields
-
-class GpsSchema(Schema):
-    longitude = fields.Number(required=True)
-    latitude = fields.Number(required=True)
\ No newline at end of file
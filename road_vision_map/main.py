@@ -264,26 +264,32 @@ class MapViewApp(tk.Tk):
             )
 
 
+def handle_event(app, payload):
+    event_type = payload.get("type")
+
+    if event_type == "batch":
+        for event in payload.get("events", []):
+            handle_event(app, event)
+    elif event_type == "created":
+        for item in payload.get("items", []):
+            app.after(0, app.upsert_item, item)
+    elif event_type == "updated":
+        item = payload.get("item")
+        if item:
+            app.after(0, app.upsert_item, item)
+    elif event_type == "deleted":
+        item_id = payload.get("id")
+        if item_id is not None:
+            app.after(0, app.remove_item, item_id)
+
+
 async def websocket_listener(app):
     while True:
         try:
             async with websockets.connect(WEBSOCKET_URL) as websocket:
                 while True:
                     raw_message = await websocket.recv()
-                    payload = json.loads(raw_message)
-                    event_type = payload.get("type")
-
-                    if event_type == "created":
-                        for item in payload.get("items", []):
-                            app.after(0, app.upsert_item, item)
-                    elif event_type == "updated":
-                        item = payload.get("item")
-                        if item:
-                            app.after(0, app.upsert_item, item)
-                    elif event_type == "deleted":
-                        item_id = payload.get("id")
-                        if item_id is not None:
-                            app.after(0, app.remove_item, item_id)
+                    handle_event(app, json.loads(raw_message))
         except Exception:
             await asyncio.sleep(3)
 
@@ -1,18 +1,23 @@
 import os
 
-def try_parse(type_, value: str):
-    try:
-        return type_(value)
-    except Exception:
-        return None
+__all__ = [
+    "POSTGRES_HOST",
+    "POSTGRES_PORT",
+    "POSTGRES_USER",
+    "POSTGRES_PASSWORD",
+    "POSTGRES_DB",
+    "DATABASE_URL",
+]
 
 POSTGRES_HOST = os.environ.get("POSTGRES_HOST") or "localhost"
-POSTGRES_PORT = try_parse(int, os.environ.get("POSTGRES_PORT") or "") or 5432
+_postgres_port = os.environ.get("POSTGRES_PORT", "").strip()
+# non-numeric or 0 falls back to the default port
+POSTGRES_PORT = (int(_postgres_port) if _postgres_port.isdecimal() else 0) or 5432
 POSTGRES_USER = os.environ.get("POSTGRES_USER") or "user"
 POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD") or "pass"
 POSTGRES_DB = os.environ.get("POSTGRES_DB") or "test_db"
 
 DATABASE_URL = (
-    f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
+    f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-)
\ No newline at end of file
+)
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import List, Optional, Set
-
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from pydantic import BaseModel, Field, field_validator
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timezone
+from typing import Annotated, List, Optional
+
+import msgspec
+from fastapi import (
+    FastAPI,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, StrictFloat, field_validator
 from sqlalchemy import (
     Column,
     DateTime,
@@ -13,13 +25,14 @@ from sqlalchemy import (
     MetaData,
     String,
     Table,
-    create_engine,
+    bindparam,
     delete,
     insert,
     select,
     text,
     update,
 )
+from sqlalchemy.ext.asyncio import create_async_engine
 
 import config
 
@@ -35,7 +48,13 @@ def calculate_repair_cost(length: float, width: float, depth: float) -> float:
 # -------------------------
 # DB setup
 # -------------------------
-engine = create_engine(config.DATABASE_URL, pool_pre_ping=True)
+engine = create_async_engine(
+    config.DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=20,
+    max_overflow=40,
+    insertmanyvalues_page_size=1000,
+)
 metadata = MetaData()
 
 processed_agent_data = Table(
@@ -57,7 +76,7 @@ processed_agent_data = Table(
 )
 
 
-def ensure_schema() -> None:
+async def ensure_schema() -> None:
     statements = [
         """
         CREATE TABLE IF NOT EXISTS processed_agent_data (
@@ -82,33 +101,61 @@ def ensure_schema() -> None:
         "ALTER TABLE processed_agent_data ADD COLUMN IF NOT EXISTS depth DOUBLE PRECISION",
         "ALTER TABLE processed_agent_data ADD COLUMN IF NOT EXISTS repair_cost DOUBLE PRECISION",
     ]
-    with engine.begin() as conn:
+    async with engine.begin() as conn:
         for statement in statements:
-            conn.execute(text(statement))
+            await conn.execute(text(statement))
+        await conn.run_sync(metadata.create_all)
 
 
-ensure_schema()
-metadata.create_all(engine)
+# Запити будуються один раз при імпорті, обробники лише підставляють параметри
+INSERT_ROWS = insert(processed_agent_data).returning(processed_agent_data)
+SELECT_ALL = select(processed_agent_data).order_by(processed_agent_data.c.id)
+SELECT_BY_ID = select(processed_agent_data).where(
+    processed_agent_data.c.id == bindparam("item_id")
+)
+SELECT_BY_IDS = (
+    select(processed_agent_data)
+    .where(processed_agent_data.c.id.in_(bindparam("ids", expanding=True)))
+    .order_by(processed_agent_data.c.id)
+)
+# SET формується з ключів параметрів при виконанні
+UPDATE_BY_ID = (
+    update(processed_agent_data)
+    .where(processed_agent_data.c.id == bindparam("item_id"))
+    .returning(processed_agent_data)
+)
+DELETE_BY_ID = (
+    delete(processed_agent_data)
+    .where(processed_agent_data.c.id == bindparam("item_id"))
+    .returning(processed_agent_data)
+)
+RESERVE_IDS = text(
+    "SELECT nextval(pg_get_serial_sequence('processed_agent_data', 'id')) "
+    "FROM generate_series(1, CAST(:n AS integer))"
+)
 
 
 # -------------------------
 # Pydantic models
 # -------------------------
+# PUT приймає один запис — його тіло валідує сам FastAPI.
+# Правила ті самі, що й у msgspec-моделей для POST нижче: числа не
+# приводяться з рядків, timestamp — лише RFC 3339 рядок із секундами.
 class AccelerometerData(BaseModel):
-    x: Optional[float] = None
-    y: Optional[float] = None
-    z: Optional[float] = None
+    x: Optional[StrictFloat] = None
+    y: Optional[StrictFloat] = None
+    z: Optional[StrictFloat] = None
 
 
 class GpsData(BaseModel):
-    latitude: float
-    longitude: float
+    latitude: StrictFloat
+    longitude: StrictFloat
 
 
 class DimensionsData(BaseModel):
-    length: float = Field(gt=0)
-    width: float = Field(gt=0)
-    depth: float = Field(gt=0)
+    length: StrictFloat = Field(gt=0)
+    width: StrictFloat = Field(gt=0)
+    depth: StrictFloat = Field(gt=0)
 
 
 class AgentData(BaseModel):
@@ -119,13 +166,15 @@ class AgentData(BaseModel):
     @field_validator("timestamp", mode="before")
     @classmethod
     def parse_timestamp(cls, value):
+        # рядок розбирає той самий парсер msgspec, що й тіло POST; числа,
+        # які pydantic у lax-режимі сприйняв би як Unix timestamp, не пускаємо
         if isinstance(value, datetime):
             return value
         try:
-            return datetime.fromisoformat(value)
-        except Exception as exc:
+            return msgspec.convert(value, datetime)
+        except msgspec.ValidationError as exc:
             raise ValueError(
-                "Invalid timestamp формат. Очікується ISO 8601, напр: 2026-02-22T12:00:00"
+                "Invalid timestamp формат. Очікується RFC 3339, напр: 2026-02-22T12:00:00"
             ) from exc
 
 
@@ -136,7 +185,49 @@ class ProcessedAgentData(BaseModel):
     dimensions: Optional[DimensionsData] = None
 
 
-class ProcessedAgentDataInDB(BaseModel):
+# -------------------------
+# msgspec models
+# -------------------------
+# Ті самі поля для пакетного POST — msgspec.Struct: тіло запиту декодується
+# з JSON одразу в об'єкти (в C), без проміжного dict і без валідаторів pydantic.
+# ISO 8601 timestamp msgspec теж розбирає сам.
+PositiveFloat = Annotated[float, msgspec.Meta(gt=0)]
+
+
+class AccelerometerDataStruct(msgspec.Struct):
+    x: Optional[float] = None
+    y: Optional[float] = None
+    z: Optional[float] = None
+
+
+class GpsDataStruct(msgspec.Struct):
+    latitude: float
+    longitude: float
+
+
+class DimensionsDataStruct(msgspec.Struct):
+    length: PositiveFloat
+    width: PositiveFloat
+    depth: PositiveFloat
+
+
+class AgentDataStruct(msgspec.Struct):
+    gps: GpsDataStruct
+    timestamp: datetime
+    accelerometer: Optional[AccelerometerDataStruct] = None
+
+
+class ProcessedAgentDataStruct(msgspec.Struct):
+    road_state: str
+    agent_data: AgentDataStruct
+    source: str = "sensor"
+    dimensions: Optional[DimensionsDataStruct] = None
+
+
+# Вихідна модель — msgspec.Struct: рядки з БД не валідуються повторно,
+# а JSON кодується в C без обходу полів pydantic.
+# Порядок полів збігається з колонками таблиці (див. row_to_model).
+class ProcessedAgentDataInDB(msgspec.Struct):
     id: int
     road_state: str
     source: str = "sensor"
@@ -152,11 +243,62 @@ class ProcessedAgentDataInDB(BaseModel):
     repair_cost: Optional[float] = None
 
 
-def payload_to_row(item: ProcessedAgentData) -> dict:
-    accelerometer = item.agent_data.accelerometer or AccelerometerData()
+json_encoder = msgspec.json.Encoder()
+batch_decoder = msgspec.json.Decoder(List[ProcessedAgentDataStruct])
+
+# FastAPI не бачить ні тіла, яке читається з Request, ні відповідей, які
+# кодує msgspec, тож схеми для OpenAPI будує msgspec; вкладені моделі
+# йдуть у components/schemas
+(
+    BATCH_SCHEMA,
+    ITEM_RESPONSE_SCHEMA,
+    LIST_RESPONSE_SCHEMA,
+), SCHEMA_COMPONENTS = msgspec.json.schema_components(
+    [
+        List[ProcessedAgentDataStruct],
+        ProcessedAgentDataInDB,
+        List[ProcessedAgentDataInDB],
+    ],
+    ref_template="#/components/schemas/{name}",
+)
+
+
+def json_responses(schema: dict) -> dict:
+    return {
+        200: {
+            "description": "Successful Response",
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+async def decode_body(request: Request, decoder: msgspec.json.Decoder):
+    # тіло читається і декодується напряму, FastAPI його не валідує
+    try:
+        return decoder.decode(await request.body())
+    except (msgspec.ValidationError, msgspec.DecodeError) as exc:
+        # detail у тому ж вигляді, що й помилки валідації самого FastAPI
+        raise HTTPException(
+            status_code=422,
+            detail=[{"loc": ["body"], "msg": str(exc), "type": "value_error"}],
+        ) from exc
+
+
+def json_response(data) -> Response:
+    return Response(json_encoder.encode(data), media_type="application/json")
+
+
+def payload_to_row(item: ProcessedAgentData | ProcessedAgentDataStruct) -> dict:
+    # PUT передає pydantic-модель, POST — msgspec.Struct; поля в них однакові
+    accelerometer = item.agent_data.accelerometer
     dimensions = item.dimensions
     repair_cost = None
 
+    # колонка timestamp без часового поясу — зберігаємо час у UTC
+    timestamp = item.agent_data.timestamp
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
     if dimensions is not None:
         repair_cost = calculate_repair_cost(
             dimensions.length,
@@ -167,12 +309,12 @@ def payload_to_row(item: ProcessedAgentData) -> dict:
     return {
         "road_state": item.road_state,
         "source": item.source,
-        "x": accelerometer.x,
-        "y": accelerometer.y,
-        "z": accelerometer.z,
+        "x": accelerometer.x if accelerometer else None,
+        "y": accelerometer.y if accelerometer else None,
+        "z": accelerometer.z if accelerometer else None,
         "latitude": item.agent_data.gps.latitude,
         "longitude": item.agent_data.gps.longitude,
-        "timestamp": item.agent_data.timestamp,
+        "timestamp": timestamp,
         "length": dimensions.length if dimensions else None,
         "width": dimensions.width if dimensions else None,
         "depth": dimensions.depth if dimensions else None,
@@ -180,152 +322,279 @@ def payload_to_row(item: ProcessedAgentData) -> dict:
     }
 
 
+# Батчі, більші за цей поріг, вставляються через COPY замість INSERT
+COPY_THRESHOLD = 100
+
+COPY_COLUMNS = (
+    "id",
+    "road_state",
+    "source",
+    "x",
+    "y",
+    "z",
+    "latitude",
+    "longitude",
+    "timestamp",
+    "length",
+    "width",
+    "depth",
+    "repair_cost",
+)
+
+
+async def copy_rows(conn, rows: list[dict]) -> list:
+    # id беремо з sequence наперед: так можна точно вибрати вставлені рядки
+    # навіть при паралельних вставках (аналог RETURNING для COPY)
+    ids = (await conn.execute(RESERVE_IDS, {"n": len(rows)})).scalars().all()
+
+    records = [
+        (row_id, *(row[column] for column in COPY_COLUMNS[1:]))
+        for row_id, row in zip(ids, rows)
+    ]
+
+    # COPY у бінарному форматі напряму через asyncpg, в тій самій транзакції
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "processed_agent_data", records=records, columns=COPY_COLUMNS
+    )
+
+    return (await conn.execute(SELECT_BY_IDS, {"ids": ids})).fetchall()
+
+
 # -------------------------
 # App + WebSocket
 # -------------------------
-app = FastAPI(title="Road Vision Store API", version="1.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global event_queue
+    await ensure_schema()
+    event_queue = asyncio.Queue()
+    flusher = asyncio.create_task(broadcast_flusher())
+    yield
+    flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await flusher
+    await engine.dispose()
+
+
+app = FastAPI(title="Road Vision Store API", version="1.1.0", lifespan=lifespan)
+
+
+def openapi() -> dict:
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        schema.setdefault("components", {}).setdefault("schemas", {}).update(
+            SCHEMA_COMPONENTS
+        )
+    return app.openapi_schema
+
+
+app.openapi = openapi
+
+# Скільки непрочитаних повідомлень тримаємо для одного підписника;
+# при переповненні найстаріше викидається
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Черги підписників; сам WebSocket потрібен лише задачі-відправнику
+subscribers: List[asyncio.Queue] = []
 
-subscribers: Set[WebSocket] = set()
+
+def unsubscribe(queue: asyncio.Queue):
+    if queue in subscribers:
+        subscribers.remove(queue)
+
+
+async def ws_sender(ws: WebSocket, queue: asyncio.Queue):
+    # окрема задача на кожного підписника: повільний клієнт не гальмує
+    # ні інших підписників, ні HTTP-запити, з яких іде розсилка
+    try:
+        while True:
+            message = await queue.get()
+            await ws.send_bytes(message)
+    except Exception:
+        unsubscribe(queue)
 
 
 @app.websocket("/ws/")
 async def ws_endpoint(ws: WebSocket):
     await ws.accept()
-    subscribers.add(ws)
+    queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    subscribers.append(queue)
+    sender = asyncio.create_task(ws_sender(ws, queue))
     try:
         while True:
             await ws.receive_text()
     except WebSocketDisconnect:
-        subscribers.discard(ws)
+        pass
     except Exception:
-        subscribers.discard(ws)
+        pass
+    finally:
+        unsubscribe(queue)
+        sender.cancel()
+
+
+def ws_broadcast(payload: dict):
+    # JSON кодується один раз у bytes і йде бінарним фреймом усім підписникам
+    message = json_encoder.encode(payload)
+    for queue in subscribers:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+
+# Як довго накопичуються події перед відправкою одним фреймом, секунди
+BROADCAST_INTERVAL = 0.005
+
+# CRUD-обробники кладуть сюди події і не чекають на розсилку;
+# створюється в lifespan, щоб належати циклу подій застосунку
+event_queue: asyncio.Queue
 
 
-async def ws_broadcast(payload: dict):
-    dead = []
-    for ws in list(subscribers):
+async def broadcast_flusher():
+    while True:
+        # чекаємо першу подію, а далі даємо зібратися решті
+        events = [await event_queue.get()]
+        await asyncio.sleep(BROADCAST_INTERVAL)
+        while not event_queue.empty():
+            events.append(event_queue.get_nowait())
+
+        # помилка одного пакета не повинна зупиняти розсилку назавжди
         try:
-            await ws.send_json(payload)
+            if len(events) == 1:
+                ws_broadcast(events[0])
+            else:
+                ws_broadcast({"type": "batch", "events": events})
         except Exception:
-            dead.append(ws)
-    for ws in dead:
-        subscribers.discard(ws)
+            logging.exception("Failed to broadcast %d event(s)", len(events))
 
 
 def row_to_model(row) -> ProcessedAgentDataInDB:
-    return ProcessedAgentDataInDB(
-        id=row.id,
-        road_state=row.road_state,
-        source=row.source or "sensor",
-        x=row.x,
-        y=row.y,
-        z=row.z,
-        latitude=row.latitude,
-        longitude=row.longitude,
-        timestamp=row.timestamp,
-        length=row.length,
-        width=row.width,
-        depth=row.depth,
-        repair_cost=row.repair_cost,
-    )
+    # рядок щойно прийшов з БД — повторна валідація не потрібна
+    return ProcessedAgentDataInDB(*row)
 
 
 # -------------------------
 # CRUD
 # -------------------------
-@app.post("/processed_agent_data/", response_model=list[ProcessedAgentDataInDB])
-async def create_processed_agent_data(items: List[ProcessedAgentData]):
+@app.post(
+    "/processed_agent_data/",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": BATCH_SCHEMA}},
+            "required": True,
+        }
+    },
+    responses=json_responses(LIST_RESPONSE_SCHEMA),
+)
+async def create_processed_agent_data(request: Request):
+    items = await decode_body(request, batch_decoder)
     if not items:
         return []
 
     rows = [payload_to_row(item) for item in items]
 
-    with engine.begin() as conn:
-        created_rows = conn.execute(
-            insert(processed_agent_data).returning(processed_agent_data),
-            rows,
-        ).fetchall()
+    async with engine.begin() as conn:
+        if len(rows) > COPY_THRESHOLD:
+            created_rows = await copy_rows(conn, rows)
+        else:
+            created_rows = (await conn.execute(INSERT_ROWS, rows)).fetchall()
 
+    # ті самі об'єкти йдуть і в розсилку, і у відповідь
     created = [row_to_model(row) for row in created_rows]
 
-    await ws_broadcast(
+    event_queue.put_nowait(
         {
             "type": "created",
-            "items": [item.model_dump(mode="json") for item in created],
+            "items": created,
         }
     )
 
-    return created
+    return json_response(created)
 
 
-@app.get("/processed_agent_data/", response_model=list[ProcessedAgentDataInDB])
-def list_processed_agent_data():
-    with engine.begin() as conn:
-        rows = conn.execute(
-            select(processed_agent_data).order_by(processed_agent_data.c.id)
-        ).fetchall()
-    return [row_to_model(row) for row in rows]
+# Скільки рядків за раз читається з курсора БД і серіалізується у відповідь
+LIST_CHUNK_SIZE = 1000
 
 
-@app.get("/processed_agent_data/{item_id}", response_model=ProcessedAgentDataInDB)
-def read_processed_agent_data(item_id: int):
-    with engine.begin() as conn:
-        row = conn.execute(
-            select(processed_agent_data).where(processed_agent_data.c.id == item_id)
-        ).fetchone()
+async def iter_processed_agent_data_json():
+    async with engine.connect() as conn:
+        result = await conn.stream(SELECT_ALL)
+
+        yield b"["
+        first = True
+        async for partition in result.partitions(LIST_CHUNK_SIZE):
+            # [1:-1] — прибираємо дужки, масив склеюємо з частин самі
+            chunk = json_encoder.encode([row_to_model(row) for row in partition])[1:-1]
+            if not first:
+                yield b","
+            yield chunk
+            first = False
+        yield b"]"
+
+
+@app.get(
+    "/processed_agent_data/", responses=json_responses(LIST_RESPONSE_SCHEMA)
+)
+async def list_processed_agent_data():
+    return StreamingResponse(
+        iter_processed_agent_data_json(), media_type="application/json"
+    )
+
+
+@app.get(
+    "/processed_agent_data/{item_id}", responses=json_responses(ITEM_RESPONSE_SCHEMA)
+)
+async def read_processed_agent_data(item_id: int):
+    async with engine.begin() as conn:
+        row = (await conn.execute(SELECT_BY_ID, {"item_id": item_id})).fetchone()
 
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
 
-    return row_to_model(row)
+    return json_response(row_to_model(row))
 
 
-@app.put("/processed_agent_data/{item_id}", response_model=ProcessedAgentDataInDB)
+@app.put(
+    "/processed_agent_data/{item_id}", responses=json_responses(ITEM_RESPONSE_SCHEMA)
+)
 async def update_processed_agent_data(item_id: int, data: ProcessedAgentData):
     values = payload_to_row(data)
 
-    with engine.begin() as conn:
-        row = conn.execute(
-            update(processed_agent_data)
-            .where(processed_agent_data.c.id == item_id)
-            .values(**values)
-            .returning(processed_agent_data)
+    async with engine.begin() as conn:
+        row = (
+            await conn.execute(UPDATE_BY_ID, {"item_id": item_id, **values})
         ).fetchone()
 
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
 
-    model = row_to_model(row)
+    item = row_to_model(row)
 
-    await ws_broadcast(
+    event_queue.put_nowait(
         {
             "type": "updated",
-            "item": model.model_dump(mode="json"),
+            "item": item,
         }
     )
 
-    return model
+    return json_response(item)
 
 
-@app.delete("/processed_agent_data/{item_id}", response_model=ProcessedAgentDataInDB)
+@app.delete(
+    "/processed_agent_data/{item_id}", responses=json_responses(ITEM_RESPONSE_SCHEMA)
+)
 async def delete_processed_agent_data(item_id: int):
-    with engine.begin() as conn:
-        row = conn.execute(
-            delete(processed_agent_data)
-            .where(processed_agent_data.c.id == item_id)
-            .returning(processed_agent_data)
-        ).fetchone()
+    async with engine.begin() as conn:
+        row = (await conn.execute(DELETE_BY_ID, {"item_id": item_id})).fetchone()
 
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
 
-    model = row_to_model(row)
-
-    await ws_broadcast(
+    event_queue.put_nowait(
         {
             "type": "deleted",
-            "id": model.id,
+            "id": row.id,
         }
     )
 
-    return model
\ No newline at end of file
+    return json_response(row_to_model(row))
\ No newline at end of file